@@ -0,0 +1,42 @@
+"""Undoable command for the Maya API edits of `hcmetanode`, see `hcmetanode.undo`."""
+import maya.api.OpenMaya as om2
+
+from hcmetanode import undo
+
+
+def maya_useNewAPI():
+    """Tell Maya this plug-in uses the Python API 2.0."""
+
+
+class CommitCommand(om2.MPxCommand):
+    """Keep the edits of the last `hcmetanode.undo.commit` for undo and redo.
+
+    The edits are already made when the command runs, it doesn't make them again.
+    """
+
+    def __init__(self):
+        om2.MPxCommand.__init__(self)
+        self._do = None
+        self._undo = None
+
+    def doIt(self, args):
+        self._do, self._undo = undo.take_pending()
+
+    def redoIt(self):
+        self._do()
+
+    def undoIt(self):
+        self._undo()
+
+    def isUndoable(self):
+        return True
+
+
+def initializePlugin(plugin):
+    om2.MFnPlugin(plugin, "HolisticCoders").registerCommand(
+        undo.PLUGIN_NAME, CommitCommand
+    )
+
+
+def uninitializePlugin(plugin):
+    om2.MFnPlugin(plugin).deregisterCommand(undo.PLUGIN_NAME)
@@ -0,0 +1,31 @@
+"""Python 2 and Python 3 compatibility aliases."""
+
+import sys
+from abc import ABCMeta
+
+PY3 = sys.version_info[0] == 3
+
+if PY3:
+    string_types = (str,)
+    xrange = range
+else:
+    string_types = (basestring,)  # noqa: F821
+    xrange = xrange  # noqa: F821
+
+# Abstract base class, `__metaclass__` is ignored by Python 3.
+ABC = ABCMeta("ABC", (object,), {})
+
+
+def with_metaclass(meta, *bases):
+    """Return a base class using the ``meta`` metaclass.
+
+    ``class Foo(with_metaclass(Meta, Base))`` is ``class Foo(Base, metaclass=Meta)``
+    in Python 3 and ``__metaclass__ = Meta`` in Python 2. Only ``Foo`` is ever
+    created through ``meta``.
+    """
+
+    class metaclass(type):
+        def __new__(cls, name, this_bases, attrs):
+            return meta(name, bases or (object,), attrs)
+
+    return type.__new__(metaclass, "temporary_class", (), {})
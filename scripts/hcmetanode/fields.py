@@ -2,13 +2,14 @@ from __future__ import absolute_import, with_statement
 
 import logging
 import traceback
-from abc import ABCMeta, abstractmethod
-from contextlib import contextmanager
+from abc import abstractmethod
 
+import maya.api.OpenMaya as om2
 import maya.cmds as cmds
 
+from .compat import ABC, xrange
 from .enum import Enum
-from .utils import get_mplug
+from .undo import commit
 
 logger = logging.getLogger(__name__)
 
@@ -28,13 +29,19 @@ class Accessibility(Enum):
     public = 2
 
 
-def get_field_class(accessibility, multi):
+_specialized_field_classes = {}
+
+
+def get_field_class(accessibility, multi, validator=None):
     """Return a field class for a set of features.
 
     Args:
         accessibility (Accessibility): Whether the field should be public or private.
         multi (bool): Whether the field should be an array attribute, or a single
             value one.
+        validator (Type[FieldValidator], optional): Validator of the field.
+            If given, the returned class is a subclass specialized for this
+            validator, see `specialize_field_class`.
 
     Returns:
         Type[FieldBase]: A field class corresponding to the expected behavior.
@@ -45,14 +52,87 @@ def get_field_class(accessibility, multi):
     """
     if multi:
         if accessibility == Accessibility.private:
-            return MultiField
+            field_cls = MultiField
         else:
             raise ValueError("A multi field cannot be public.")
     else:
-        return PublicField if accessibility == Accessibility.public else Field
+        field_cls = PublicField if accessibility == Accessibility.public else Field
+
+    if validator is None:
+        return field_cls
+    return specialize_field_class(field_cls, validator)
+
+
+def specialize_field_class(field_cls, validator):
+    """Return a subclass of ``field_cls`` bound to ``validator``.
+
+    The subclass stores the validator conversion functions as its own
+    attributes, so reading and writing values doesn't look them up on the
+    validator each time. Subclasses are created once per pair.
+
+    Args:
+        field_cls (Type[FieldBase]): Field class to specialize.
+        validator (Type[FieldValidator]): Validator to bind.
+
+    Returns:
+        Type[FieldBase]: The specialized field class.
+    """
+    key = (field_cls, validator)
+    specialized_cls = _specialized_field_classes.get(key)
+    if specialized_cls is None:
+        name = "{}{}".format(validator.__name__, field_cls.__name__)
+        specialized_cls = type(
+            name,
+            (field_cls,),
+            {
+                # Not "abc", the module of the `FieldBase` metaclass.
+                "__module__": __name__,
+                "__qualname__": name,
+                "_read_plug": staticmethod(validator.read_plug),
+                "_write_plug": staticmethod(validator.write_plug),
+                "_from_attribute": staticmethod(validator.from_attribute),
+                "_to_attribute": staticmethod(validator.to_attribute),
+            },
+        )
+        _specialized_field_classes[key] = specialized_cls
+    return specialized_cls
 
 
-class FieldBase(object):
+def commit_writes(modifier, fields):
+    """Run the writes queued on ``modifier``, as a single undoable edit.
+
+    The fields are unlocked while the modifier runs, and locked after it.
+    Undoing the edit restores the lock state they had before.
+
+    Args:
+        modifier (maya.api.OpenMaya.MDGModifier): Modifier the writes of
+            ``fields`` are queued on.
+        fields (list[FieldBase]): Fields written by ``modifier``.
+    """
+    lock_states = [field._get_lock_state() for field in fields]
+
+    def do():
+        for field in fields:
+            field._unlock()
+        try:
+            modifier.doIt()
+        finally:
+            for field in fields:
+                field._lock()
+
+    def undo():
+        for field in fields:
+            field._unlock()
+        try:
+            modifier.undoIt()
+        finally:
+            for field, lock_state in zip(fields, lock_states):
+                field._set_lock_state(lock_state)
+
+    commit(do, undo)
+
+
+class FieldBase(ABC):
     """Base class for Fields defining the common interface for all Fields.
 
     A Field is a Wrapper on a maya attribute that does three things:
@@ -80,13 +160,13 @@ class FieldBase(object):
         mplug (maya.api.OpenMaya.MPlug): Handle to the MPlug instance.
     """
 
-    __metaclass__ = ABCMeta
-
     def __init__(self, validator_class, metanode, name, default_value=None, **kwargs):
         self.validator = validator_class
         self.create_attribute_kwargs = self.validator.process_kwargs(**kwargs)
         self.metanode = metanode
         self.name = name
+        self._path = None
+        self._metanode_path = None
         self._value = (
             default_value
             if default_value is not None
@@ -95,17 +175,24 @@ class FieldBase(object):
 
         self.create_attribute()
 
-        self.mplug = get_mplug(self.path())
+        # The plug follows the node through renames, unlike its path.
+        self.mplug = self.metanode._mfn_dep.findPlug(self.name, False)
 
         self.read()
 
     def path(self):
         """Return the full path of the maya attribute.
 
+        The path is only rebuilt when the path of the `MetaNode` changes.
+
         Returns:
             str: Full path of the Maya attribute.
         """
-        return "{path}.{name}".format(path=self.metanode.path(), name=self.name)
+        metanode_path = self.metanode.path()
+        if metanode_path is not self._metanode_path:
+            self._metanode_path = metanode_path
+            self._path = "{path}.{name}".format(path=metanode_path, name=self.name)
+        return self._path
 
     @abstractmethod
     def create_attribute(self):
@@ -128,38 +215,99 @@ class FieldBase(object):
     def read(self):
         """Read the field value from Maya."""
 
-    @abstractmethod
     def write(self):
         """Write the field value to Maya."""
+        modifier = om2.MDGModifier()
+        if self.queue_write(modifier):
+            commit_writes(modifier, [self])
+
+    @abstractmethod
+    def queue_write(self, modifier):
+        """Queue the write of the field value to Maya.
+
+        The attribute is still locked, see `commit_writes` to run ``modifier``.
+
+        Args:
+            modifier (maya.api.OpenMaya.MDGModifier): Modifier to queue the
+                write on.
+
+        Returns:
+            bool: ``True`` if a write was queued, or if the attribute holds
+                the field value but needs to be locked again. ``False`` if
+                there is nothing to commit.
+        """
 
     def serialize(self):
         """Serialize the field value to a JSON compatible value."""
         return self.validator.serialize(self.get())
 
-    @contextmanager
-    def _protect_attribute(self):
-        cmds.setAttr(self.path(), lock=False)
+    def _value_changed(self):
+        """Drop the data cached by `MetaNode.serialize`."""
+        self.metanode._serialized = None
 
-        yield
+    def _add_attribute(self, multi=False, channel_box=False):
+        """Add the Maya attribute, with the Maya API when the validator allows it.
 
-        cmds.setAttr(self.path(), lock=True)
+        Args:
+            multi (bool, optional): Whether to add a multi attribute.
+            channel_box (bool, optional): Whether to show the attribute in the
+                channel box.
+        """
+        attribute = self.validator.create_mattribute(
+            self.name, multi, channel_box, **self.create_attribute_kwargs
+        )
+        if attribute is not None:
+            modifier = om2.MDGModifier()
+            modifier.addAttribute(self.metanode.mobject, attribute)
+            commit(modifier.doIt, modifier.undoIt)
+            return
 
+        cmds.addAttr(
+            self.metanode.path(),
+            longName=self.name,
+            multi=multi,
+            keyable=False,
+            **self.create_attribute_kwargs
+        )
+        if channel_box:
+            cmds.setAttr(self.path(), edit=True, channelBox=True)
 
-class SingleFieldBase(FieldBase):  # pylint: disable=abstract-method
-    """Field class used for "single" attributes."""
+    def _read_plug(self, plug):
+        return self.validator.read_plug(plug)
 
-    __metaclass__ = ABCMeta
+    def _write_plug(self, modifier, plug, value):
+        self.validator.write_plug(modifier, plug, value)
 
-    def create_attribute(self):
-        if not cmds.attributeQuery(self.name, node=self.metanode.path(), exists=True):
+    def _from_attribute(self, value):
+        return self.validator.from_attribute(value)
 
-            cmds.addAttr(
-                self.metanode.path(),
-                longName=self.name,
-                keyable=False,
-                **self.create_attribute_kwargs
-            )
+    def _to_attribute(self, value):
+        return self.validator.to_attribute(value)
+
+    def _unlock(self):
+        self.mplug.isLocked = False
+
+    def _lock(self):
+        self.mplug.isLocked = True
+
+    def _lock_needed(self):
+        """Return whether the attribute should be locked, and isn't."""
+        return not self.mplug.isLocked
+
+    def _get_lock_state(self):
+        """Return the lock state of the attribute, for `_set_lock_state`."""
+        return self.mplug.isLocked
+
+    def _set_lock_state(self, lock_state):
+        self.mplug.isLocked = lock_state
 
+
+class SingleFieldBase(FieldBase):  # pylint: disable=abstract-method
+    """Field class used for "single" attributes."""
+
+    def create_attribute(self):
+        if not self.metanode._mfn_dep.hasAttribute(self.name):
+            self._add_attribute()
             return True
 
         return False
@@ -175,48 +323,98 @@ class Field(SingleFieldBase):
     def set(self, value):
         """Set the field value."""
         self._value = value
+        self._value_changed()
 
-    def write(self):
+    def queue_write(self, modifier):
         try:
-            value = self.validator.to_attribute(self._value)
+            value = self._to_attribute(self._value)
         except Exception as error:
             logger.debug(traceback.format_exc())
             logger.warning(error)
-        else:
-            with self._protect_attribute():
-                if cmds.listConnections(self.path(), source=True, destination=False):
-                    return
-                cmds.setAttr(self.path(), value, **self.validator.set_attribute_kwargs)
+            return False
+
+        # Comparing with the plug is cheaper than writing an unchanged value.
+        if not self.mplug.isDestination and self._read_plug(self.mplug) != value:
+            self._write_plug(modifier, self.mplug, value)
+            return True
+        # Nothing to write, but a private field may have been unlocked.
+        return self._lock_needed()
 
     def read(self):
-        value = cmds.getAttr(self.path())
+        value = self._read_plug(self.mplug)
         if value is None:
             return
-        self._value = self.validator.from_attribute(value)
+        value = self._from_attribute(value)
+        if value != self._value:
+            self._value_changed()
+        self._value = value
+
+    def get_at(self, time):
+        """Return the value of the Maya attribute at a given time.
+
+        The field value is left untouched.
+
+        Args:
+            time (float or maya.api.OpenMaya.MTime): Time to evaluate the
+                attribute at, in the current time unit if given as a number.
+
+        Returns:
+            The attribute value at ``time``, or the field value if the
+            attribute holds no value.
+        """
+        if not isinstance(time, om2.MTime):
+            time = om2.MTime(time, om2.MTime.uiUnit())
+
+        # `MDGContextGuard` was added in Maya 2018.
+        if hasattr(om2, "MDGContextGuard"):
+            with om2.MDGContextGuard(om2.MDGContext(time)):
+                value = self._read_plug(self.mplug)
+        else:
+            value = cmds.getAttr(
+                self.mplug.name(), time=time.asUnits(om2.MTime.uiUnit())
+            )
+
+        if value is None:
+            return self._value
+        return self._from_attribute(value)
 
 
 class PublicField(Field):
     """Field class used for public "single" attributes."""
 
     def create_attribute(self):
-        if super(PublicField, self).create_attribute():
-            cmds.setAttr(self.path(), edit=True, channelBox=True)
+        if not self.metanode._mfn_dep.hasAttribute(self.name):
+            self._add_attribute(channel_box=True)
             return True
+
         return False
 
     def get(self):
         """Return the field value from Maya."""
-        return self.read()
+        self.read()
+        return self._value
 
     def set(self, value):
         """Write the field value to Maya."""
         self._value = value
+        self._value_changed()
         self.write()
 
-    @contextmanager
-    def _protect_attribute(self):
+    def _unlock(self):
+        """Public fields are never locked."""
+
+    def _lock(self):
         """Never lock a public field."""
-        yield
+
+    def _lock_needed(self):
+        """Public fields are never locked."""
+        return False
+
+    def _get_lock_state(self):
+        return None
+
+    def _set_lock_state(self, lock_state):
+        """Public fields are never locked."""
 
 
 class MultiField(FieldBase):  # pylint: disable=abstract-method
@@ -230,16 +428,8 @@ class MultiField(FieldBase):  # pylint: disable=abstract-method
         )
 
     def create_attribute(self):
-        if not cmds.attributeQuery(self.name, node=self.metanode.path(), exists=True):
-
-            cmds.addAttr(
-                self.metanode.path(),
-                longName=self.name,
-                multi=True,
-                keyable=False,
-                **self.create_attribute_kwargs
-            )
-
+        if not self.metanode._mfn_dep.hasAttribute(self.name):
+            self._add_attribute(multi=True)
             return True
 
         return False
@@ -251,37 +441,49 @@ class MultiField(FieldBase):  # pylint: disable=abstract-method
     def set(self, value):
         """Set the field value."""
         self._value = value
+        self._value_changed()
 
-    def write(self):
+    def queue_write(self, modifier):
         value = self._value
-
-        with self._protect_attribute():
-
-            self._clear_maya_attribute()
-
-            for i, index_value in enumerate(value):
-
-                index_value = self.validator.to_attribute(index_value)
-                cmds.setAttr(
-                    "{path}[{i}]".format(path=self.path(), i=i),
-                    index_value,
-                    **self.validator.set_attribute_kwargs
-                )
+        queued = False
+        existing_plugs = {}
+        for plug in self._element_plugs():
+            index = plug.logicalIndex()
+            # Only the elements past the new length need removing,
+            # the others are overwritten.
+            if index >= len(value):
+                modifier.removeMultiInstance(plug, True)
+                queued = True
+            else:
+                existing_plugs[index] = plug
+                # Unchanged elements may still need to be locked again.
+                if not plug.isLocked:
+                    queued = True
+
+        for i, index_value in enumerate(value):
+            index_value = self._to_attribute(index_value)
+            plug = existing_plugs.get(i)
+            if plug is None:
+                plug = self.mplug.elementByLogicalIndex(i)
+            # Elements already holding their value are left untouched.
+            elif self._read_plug(plug) == index_value:
+                continue
+            self._write_plug(modifier, plug, index_value)
+            queued = True
+
+        return queued
 
     def read(self):
-        result = []
-        for attr in self._iter_elements():
-            value = self.validator.from_attribute(cmds.getAttr(attr))
-            result.append(value)
-
-        self._value = result
+        from_attribute = self._from_attribute
+        read_plug = self._read_plug
+        value = [from_attribute(read_plug(plug)) for plug in self._element_plugs()]
+        if value != self._value:
+            self._value_changed()
+        self._value = value
 
     def serialize(self):
-        value = self.get()
-        if value:
-            return self.validator.serialize(value)
-        else:
-            return []
+        serialize = self.validator.serialize
+        return [serialize(index_value) for index_value in self.get()]
 
     def clear(self):
         self._clear_python_attribute()
@@ -289,26 +491,45 @@ class MultiField(FieldBase):  # pylint: disable=abstract-method
 
     def _clear_python_attribute(self):
         self._value = []
+        self._value_changed()
 
     def _clear_maya_attribute(self):
-        cmds.setAttr(self.path(), lock=False)
+        element_plugs = self._element_plugs()
+        if not element_plugs:
+            return
+
+        # All the elements are removed at once.
+        modifier = om2.MDGModifier()
+        for plug in element_plugs:
+            modifier.removeMultiInstance(plug, True)
+        commit_writes(modifier, [self])
+
+    def _unlock(self):
+        for plug in self._element_plugs():
+            plug.isLocked = False
 
-        for attr in self._iter_elements():
-            cmds.setAttr(attr, lock=False)
+    def _lock(self):
+        # Elements are listed again, writing may have added or removed some.
+        for plug in self._element_plugs():
+            plug.isLocked = True
 
-        cmds.removeMultiInstance(self.path(), allChildren=True, b=True)
+    def _lock_needed(self):
+        return any(not plug.isLocked for plug in self._element_plugs())
 
-    @contextmanager
-    def _protect_attribute(self):
-        for attr in self._iter_elements():
-            cmds.setAttr(attr, lock=False)
+    def _get_lock_state(self):
+        # By logical index, the physical ones change with the elements.
+        return {plug.logicalIndex(): plug.isLocked for plug in self._element_plugs()}
 
-        yield
+    def _set_lock_state(self, lock_state):
+        # Elements added by the write are already removed by its undo.
+        for plug in self._element_plugs():
+            plug.isLocked = lock_state.get(plug.logicalIndex(), False)
 
-        for attr in self._iter_elements():
-            cmds.setAttr(attr, lock=True)
+    def _element_plugs(self):
+        """Return the plugs of the existing elements.
 
-    def _iter_elements(self):
-        for index in xrange(self.mplug.numElements()):
-            plug = self.mplug.elementByLogicalIndex(index)
-            yield plug.name()
+        Returns:
+            list[maya.api.OpenMaya.MPlug]: Element plugs, in physical order.
+        """
+        mplug = self.mplug
+        return [mplug.elementByPhysicalIndex(i) for i in xrange(mplug.numElements())]
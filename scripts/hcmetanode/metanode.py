@@ -1,8 +1,42 @@
+import weakref
+
 import maya.api.OpenMaya as om2
 import maya.cmds as cmds
 
-from .fields import Accessibility, get_field_class
-from .utils import all_subclasses, get_mobject, get_uuid
+from .compat import string_types
+from .undo import commit
+from .fields import Accessibility, PublicField, commit_writes, get_field_class
+from .utils import (
+    batch_edit,
+    clear_subclasses_cache,
+    find_subclass,
+    get_mobject,
+    get_uuid,
+    is_uuid,
+)
+
+
+def _invalidate_paths(*args):
+    """Invalidate the cached names and paths of all MetaNodes and their fields."""
+    MetaNode._path_generation += 1
+
+
+def _forget_instance(node, *args):
+    """Drop the MetaNode instance of a node removed from the scene."""
+    uuid = get_uuid(node)
+    instance = MetaNode._instances.get(uuid)
+    # UUIDs can be duplicated, by referencing a file twice for instance.
+    if instance is not None and instance.mobject == node:
+        del MetaNode._instances[uuid]
+
+
+# Set when the module is being reloaded: the callbacks of the previous class
+# would never be removed, and keep firing alongside the new ones.
+_previous_class = globals().get("MetaNode")
+if _previous_class is not None and _previous_class._callback_ids:
+    om2.MMessage.removeCallbacks(_previous_class._callback_ids)
+    _previous_class._callback_ids = []
+del _previous_class
 
 
 class MetaNode(object):
@@ -11,23 +45,47 @@ class MetaNode(object):
     The MetaNode keeps a reference to the API MObject
 
     Args:
-        node (str): Name of the Maya node to wrap.
-            It should be a unique name, as it is forwarded to
+        node (str): Name or UUID of the Maya node to wrap.
+            A name should be unique, as it is forwarded to
             `maya.api.OpenMaya.MSelectionList.add`.
 
     Attributes:
         mobject (maya.api.OpenMaya.MObject): Handle to Maya's MObject.
         fields (dict[str, FieldBase]): Fields of this MetaNode.
+            Fields stored on the node are only created and read from Maya
+            on first access; getting this dict loads all of them.
     """
 
-    _instances = {}
+    __slots__ = (
+        "mobject",
+        "_fields",
+        "_pending_fields",
+        "_serialized",
+        "_mfn_dep",
+        "_handle",
+        "_cached_name",
+        "_cached_name_generation",
+        "_cached_path",
+        "_cached_path_generation",
+        "_initialized",
+        "__weakref__",
+    )
+
+    _instances = weakref.WeakValueDictionary()
+
+    # Bumped by Maya callbacks on any rename or DAG change, as those can
+    # change the full path of a node without touching the node itself.
+    _path_generation = 0
+    _callback_ids = []
 
     def __new__(cls, node):
         """Re-instantiate the proper MetaNode subclass if the node has already been a MetaNode in its lifetime."""
-        if not isinstance(node, basestring):
+        if not isinstance(node, string_types):
             raise TypeError("MetaNode can only be instanciated from a node name.")
 
-        if not cmds.objExists(node):
+        try:
+            mobject = get_mobject(node)
+        except ValueError:
             raise ValueError(
                 "Specified Maya node {} does not exist; "
                 "`MetaNode.new` can be used to create a node along with the MetaNode".format(
@@ -35,24 +93,27 @@ class MetaNode(object):
                 )
             )
 
-        uuid = get_uuid(get_mobject(node))
+        mfn_dep = om2.MFnDependencyNode(mobject)
+        uuid = mfn_dep.uuid().asString()
         instance = MetaNode._instances.get(uuid)
-        if instance:
-            return instance
-
-        if cmds.attributeQuery("metanode_type", node=node, exists=True):
-            stored_class_name = cmds.getAttr("{}.metanode_type".format(node))
-        else:
+        if instance is not None:
+            # The UUID is stable across renames and reparenting, but the cached
+            # instance may wrap a deleted node, or another node with this UUID.
+            if instance._handle.isValid() and instance.mobject == mobject:
+                return instance
+            del MetaNode._instances[uuid]
+
+        stored_class_name = None
+        if mfn_dep.hasAttribute("metanode_type"):
+            stored_class_name = mfn_dep.findPlug("metanode_type", False).asString()
+        # The type may not have been written yet.
+        if not stored_class_name:
             stored_class_name = cls.__name__
 
-        class_to_instantiate = None
-
         if stored_class_name == cls.__name__:
             class_to_instantiate = cls
         else:
-            for subclass in all_subclasses(cls):
-                if stored_class_name == subclass.__name__:
-                    class_to_instantiate = subclass
+            class_to_instantiate = find_subclass(cls, stored_class_name)
 
         if class_to_instantiate is None:
             raise Exception(
@@ -64,33 +125,79 @@ class MetaNode(object):
                 )
             )
 
-        return super(MetaNode, cls).__new__(class_to_instantiate)
+        instance = super(MetaNode, cls).__new__(class_to_instantiate)
+        # Handed over to `__init__`, to not resolve the node twice.
+        instance.mobject = mobject
+        instance._mfn_dep = mfn_dep
+        return instance
 
-    def __init__(self, node):
-        self.mobject = get_mobject(node)
-
-        self.fields = {}
+    def __init_subclass__(cls, **kwargs):
+        super(MetaNode, cls).__init_subclass__(**kwargs)
+        clear_subclasses_cache()
 
+    def __init__(self, node):
+        # `__new__` returns already initialized instances for known nodes.
+        if getattr(self, "_initialized", False):
+            return
+
+        if not MetaNode._callback_ids:
+            MetaNode._register_callbacks()
+
+        self._handle = om2.MObjectHandle(self.mobject)
+        self._cached_name = None
+        self._cached_name_generation = None
+        self._cached_path = None
+        self._cached_path_generation = None
+
+        self._fields = {}
+        # Fields stored on the node but not accessed yet, by name.
+        self._pending_fields = {}
+        # Last `serialize` data, dropped when a field value changes.
+        self._serialized = None
+
+        # Fields are read from Maya as they are added.
         self.add_default_fields()
 
-        if self.uuid() not in MetaNode._instances:
-            self.read_fields()
-            MetaNode._instances[self.uuid()] = self
+        MetaNode._instances[self.uuid()] = self
 
         if not self.is_initialized.get():
             self.initialize()
             self.is_initialized.set(True)
 
+        self._initialized = True
+
+    @staticmethod
+    def _register_callbacks():
+        """Register the Maya callbacks shared by all MetaNodes."""
+        MetaNode._remove_callbacks()
+        MetaNode._callback_ids = [
+            om2.MNodeMessage.addNameChangedCallback(
+                om2.MObject.kNullObj, _invalidate_paths
+            ),
+            om2.MDagMessage.addAllDagChangesCallback(_invalidate_paths),
+            om2.MDGMessage.addNodeRemovedCallback(_forget_instance, "dependNode"),
+        ]
+
+    @staticmethod
+    def _remove_callbacks():
+        """Remove the Maya callbacks registered by `_register_callbacks`."""
+        if MetaNode._callback_ids:
+            om2.MMessage.removeCallbacks(MetaNode._callback_ids)
+        MetaNode._callback_ids = []
+
     @classmethod
     def new(cls, *args, **kwargs):
         """Create a new MetaNode along with a new maya node.
 
         Subclasses should override this method to create the according maya node.
 
+        The node creation and the MetaNode default fields are undone at once.
+
         Args:
             args and kwargs are passed as is to cmds.createNode()
         """
-        return cls(cmds.createNode(*args, **kwargs))
+        with batch_edit():
+            return cls(cmds.createNode(*args, **kwargs))
 
     @classmethod
     def from_uuid(cls, uuid):
@@ -102,10 +209,9 @@ class MetaNode(object):
         Returns:
             MetaNode: New MetaNode around the given UUID.
         """
-        node = cmds.ls(uuid)
-        if not node:
-            raise ValueError("No node with uuid '{}'".format(uuid))
-        return MetaNode.__new__(cls, node[0])
+        if not is_uuid(uuid):
+            raise ValueError("'{}' is not a valid UUID".format(uuid))
+        return cls(uuid)
 
     def initialize(self):
         """Initialize the MetaNode.
@@ -122,22 +228,36 @@ class MetaNode(object):
         """
         from .validators import (
             BoolValidator,
-            FieldValidator,
-            JsonValidator,
+            SchemaValidator,
             StringValidator,
+            ValidatorMeta,
+        )
+
+        self._add_attributes_batch(
+            [
+                (SchemaValidator, "metanode_fields", False),
+                (StringValidator, "metanode_type", False),
+                (BoolValidator, "is_initialized", False),
+            ]
         )
 
-        self.add_field(JsonValidator, "metanode_fields", Accessibility.private)
+        self.add_field(SchemaValidator, "metanode_fields", Accessibility.private)
 
-        for field_name, field_data in self.metanode_fields.get().items():
+        for field_name, field_data in list(self.metanode_fields.get().items()):
+            # Copied, the stored data is compared against in `add_field`.
+            field_data = dict(field_data)
             validator_name = field_data.pop("validator")
             accessibility = Accessibility(field_data.pop("accessibility"))
             multi = field_data.pop("multi")
-            for validator_cls in all_subclasses(FieldValidator):
-                if validator_cls.__name__ == validator_name:
-                    self.add_field(
-                        validator_cls, field_name, accessibility, multi, **field_data
-                    )
+            validator_cls = ValidatorMeta.registry.get(validator_name)
+            if validator_cls is not None and field_name not in self._fields:
+                # Created on first access, see `_load_field`.
+                self._pending_fields[field_name] = (
+                    validator_cls,
+                    accessibility,
+                    multi,
+                    field_data,
+                )
 
         self.add_field(StringValidator, "metanode_type", Accessibility.private)
         self.metanode_type.set(self.__class__.__name__)
@@ -159,12 +279,11 @@ class MetaNode(object):
                 and a multi attribute in Maya.
             **kwargs: Additional arguments for the `Field` or `MultiField`
                 constructor and underlying `maya.cmds.addAttr` call.
-        """
-        field_cls = get_field_class(accessibility, multi)
-        field = field_cls(validator, self, name, **kwargs)
-
-        self.fields[name] = field
 
+        Returns:
+            FieldBase: The new field, or the existing one if a field with the
+                same name and arguments was already added.
+        """
         field_data = {
             "validator": validator.__name__,
             "multi": multi,
@@ -172,31 +291,113 @@ class MetaNode(object):
         }
         field_data.update(kwargs)
 
+        self._pending_fields.pop(name, None)
+
+        # Fields stored on the node are added again by `add_default_fields`
+        # overrides, don't create and read them twice.
+        field = self._fields.get(name)
+        if field is not None and self.metanode_fields.get().get(name) == field_data:
+            return field
+
+        field_cls = get_field_class(accessibility, multi, validator)
+        field = field_cls(validator, self, name, **kwargs)
+
+        self._fields[name] = field
+
         self.metanode_fields.get()[name] = field_data
+        self._serialized = None
 
         return field
 
+    @property
+    def fields(self):
+        """dict[str, FieldBase]: All the fields of this MetaNode."""
+        self._load_fields()
+        return self._fields
+
+    def _load_fields(self):
+        """Create all the fields stored on the node but not accessed yet."""
+        for name in list(self._pending_fields):
+            self._load_field(name)
+
+    def _load_field(self, name):
+        """Create a field stored on the node but not accessed yet.
+
+        Args:
+            name (str): Name of the pending field.
+
+        Returns:
+            FieldBase: The loaded field.
+        """
+        validator, accessibility, multi, kwargs = self._pending_fields.pop(name)
+        return self.add_field(validator, name, accessibility, multi, **kwargs)
+
+    def _add_attributes_batch(self, specs):
+        """Add the missing attributes of several fields with a single `MDGModifier`.
+
+        Attributes the validator can't create with the Maya API are skipped,
+        and left for their field to create.
+
+        Args:
+            specs (list[tuple]): ``(validator, name, multi)`` of each field.
+        """
+        modifier = om2.MDGModifier()
+        added = False
+        for validator, name, multi in specs:
+            if self._mfn_dep.hasAttribute(name):
+                continue
+            attribute = validator.create_mattribute(
+                name, multi, **validator.process_kwargs()
+            )
+            if attribute is not None:
+                modifier.addAttribute(self.mobject, attribute)
+                added = True
+        if added:
+            commit(modifier.doIt, modifier.undoIt)
+
     def read_fields(self):
         """Load the maya attributes in memory."""
-        for field in self.fields.itervalues():
+        for field in list(self._fields.values()):
             field.read()
+        # Pending fields are read as they are loaded.
+        self._load_fields()
 
     def write_fields(self):
-        """write the python attributes stored in memory to the maya attribtute."""
-        for field in self.fields.itervalues():
-            field.write()
+        """write the python attributes stored in memory to the maya attribtute.
+
+        All fields queue their write on a single `maya.api.OpenMaya.MDGModifier`,
+        which is executed once instead of once per field. Unchanged values
+        are not written, nor are fields that were never accessed.
+        """
+        modifier = om2.MDGModifier()
+        written_fields = [
+            field for field in self._fields.values() if field.queue_write(modifier)
+        ]
+        if written_fields:
+            commit_writes(modifier, written_fields)
 
     def serialize(self):
         """Serialize the `MetaNode` to a JSON serializable object.
 
+        The data is cached until a field value is set or read with a
+        different value. Values modified in place, without calling
+        `FieldBase.set`, aren't noticed.
+
         Returns:
             dict: A dict representation of the `MetaNode`.
         """
-        data = {}
-        data["uuid"] = self.uuid()
-        for name, field in self.fields.items():
-            data[name] = field.serialize()
-        return data
+        # Public fields can be edited from Maya at any time.
+        for field in self.fields.values():
+            if isinstance(field, PublicField):
+                field.read()
+
+        if self._serialized is None:
+            data = {}
+            data["uuid"] = self.uuid()
+            for name, field in self._fields.items():
+                data[name] = field.serialize()
+            self._serialized = data
+        return dict(self._serialized)
 
     def name(self):
         """Return the short name of this MetaNode.
@@ -204,21 +405,32 @@ class MetaNode(object):
         If passing the metanode to a maya.cmds command,
         use MetaNode.path() instead.
 
+        The name is cached until a node is renamed or the DAG changes.
+
         Returns:
             str: Short name of this `MetaNode`.
         """
-        return om2.MFnDependencyNode(self.mobject).name()
+        if self._cached_name_generation != MetaNode._path_generation:
+            self._cached_name = self._mfn_dep.name()
+            self._cached_name_generation = MetaNode._path_generation
+        return self._cached_name
 
     def path(self):
         """Return the full DAG Path of this MetaNode.
 
+        The path is cached until a node is renamed or the DAG changes.
+
         Returns:
             str: Full path of this `MetaNode`.
         """
-        if self.mobject.hasFn(om2.MFn.kDagNode):
-            return om2.MFnDagNode(self.mobject).getPath().fullPathName()
-        else:
-            return self.name()
+        if self._cached_path_generation != MetaNode._path_generation:
+            if self.mobject.hasFn(om2.MFn.kDagNode):
+                path = om2.MFnDagNode(self.mobject).getPath().fullPathName()
+            else:
+                path = self.name()
+            self._cached_path = path
+            self._cached_path_generation = MetaNode._path_generation
+        return self._cached_path
 
     def uuid(self):
         """Returns the Maya's scene UUID of the underlying node.
@@ -226,14 +438,25 @@ class MetaNode(object):
         Returns:
             str: UUID of the underlying Maya node.
         """
-        return get_uuid(self.mobject)
+        return self._mfn_dep.uuid().asString()
 
     def __getattr__(self, name):
-        """Get the fields of this MetaNode."""
-        field = self.fields.get(name)
-        if field is not None:
-            return field
-        return None
+        """Get the fields of this MetaNode.
+
+        Raises:
+            AttributeError: If there is no field with this name.
+        """
+        # Not `self._fields`, which would recurse until it is set in `__init__`.
+        fields = object.__getattribute__(self, "_fields")
+        if name in fields:
+            return fields[name]
+        if name in object.__getattribute__(self, "_pending_fields"):
+            return self._load_field(name)
+        raise AttributeError(
+            "'{}' object has no attribute or field '{}'".format(
+                self.__class__.__name__, name
+            )
+        )
 
     def __repr__(self):
         return "{}({})".format(self.__class__.__name__, self.name())
@@ -242,4 +465,17 @@ class MetaNode(object):
         return self.path()
 
     def __eq__(self, other):
-        return self.uuid() == other.uuid()
+        if self is other:
+            return True
+        if not isinstance(other, MetaNode):
+            return NotImplemented
+        return self.mobject == other.mobject
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __hash__(self):
+        return self._handle.hashCode()
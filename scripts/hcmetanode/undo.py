@@ -0,0 +1,66 @@
+"""Put Maya API edits on Maya's undo queue.
+
+Edits made from a script with `maya.api.OpenMaya.MDGModifier`, or by setting
+`maya.api.OpenMaya.MPlug.isLocked`, are not undoable on their own. `commit`
+hands them to the ``hcMetanodeCommit`` command, from the plug-in shipped in
+the ``plug-ins`` folder of this module, which undoes and redoes them.
+"""
+import os
+
+import maya.cmds as cmds
+
+PLUGIN_NAME = "hcMetanodeCommit"
+
+_PLUGIN_PATH = os.path.normpath(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.pardir,
+        os.pardir,
+        "plug-ins",
+        PLUGIN_NAME + ".py",
+    )
+)
+
+_plugin_loaded = False
+
+# Edits done by `commit`, waiting for the plug-in command to take them.
+_pending = []
+
+
+def commit(do, undo):
+    """Run edits, and put them on Maya's undo queue.
+
+    ``do`` runs right away, so its errors propagate as usual. The edits are
+    only put on the undo queue once it succeeds.
+
+    Args:
+        do (callable): Make the edits. Called again on redo.
+        undo (callable): Revert the edits made by ``do``.
+    """
+    do()
+
+    _load_plugin()
+    _pending.append((do, undo))
+    try:
+        getattr(cmds, PLUGIN_NAME)()
+    finally:
+        del _pending[:]
+
+
+def take_pending():
+    """Return the edits of the last `commit`, for the plug-in command.
+
+    Returns:
+        tuple[callable, callable]: ``do`` and ``undo`` functions of the edits.
+    """
+    return _pending.pop()
+
+
+def _load_plugin():
+    global _plugin_loaded
+
+    if _plugin_loaded:
+        return
+    if not cmds.pluginInfo(PLUGIN_NAME, query=True, loaded=True):
+        cmds.loadPlugin(_PLUGIN_PATH, quiet=True)
+    _plugin_loaded = True
@@ -1,6 +1,15 @@
+import re
+from contextlib import contextmanager
+
 import maya.api.OpenMaya as om2
 import maya.cmds as cmds
 
+_batch_edit_depth = 0
+
+_UUID_RE = re.compile(
+    r"^[A-Z0-9]{8}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}\Z"
+)
+
 
 def get_uuid(mobject):
     """Return a `maya.api.OpenMaya.MObject` UUID.
@@ -26,10 +35,7 @@ def set_uuid(mobject, uuid):
         # TODO: Use a different error type.
         ValueError: If the UUID is already taken.
     """
-    pattern = re.compile(
-        r"[A-Z0-9]{8}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{12}"
-    )
-    if not pattern.match(uuid):
+    if not _UUID_RE.match(uuid):
         raise ValueError("'{}' is not a valid UUID".format(uuid))
 
     existing_node = cmds.ls(uuid)
@@ -44,19 +50,54 @@ def set_uuid(mobject, uuid):
     om2.MFnDependencyNode(mobject).setUuid(uuid)
 
 
+def is_uuid(value):
+    """Return whether a string is formatted as a Maya UUID.
+
+    Node names can't contain dashes, so a UUID can't be mistaken for a name.
+
+    Args:
+        value (str): String to check.
+
+    Returns:
+        bool: ``True`` if ``value`` is a UUID.
+    """
+    return _UUID_RE.match(value) is not None
+
+
 def get_mobject(node):
-    """Return a `maya.api.OpenMaya.MObject` from a node name.
+    """Return a `maya.api.OpenMaya.MObject` from a node name or UUID.
 
     Args:
-        node (str): Name of the node.
-            It should be unique as it is forwarded to
+        node (str): Name or UUID of the node.
+            A name should be unique as it is forwarded to
             `maya.api.OpenMaya.MSelectionList.add`.
 
     Returns:
         maya.api.OpenMaya.MObject: The underlying MObject.
+
+    Raises:
+        ValueError: If no node has this name or UUID.
+        RuntimeError: If more than one node matches the name.
     """
     sel_list = om2.MSelectionList()
-    sel_list.add(node)
+    if is_uuid(node):
+        try:
+            sel_list.add(om2.MUuid(node))
+        except RuntimeError:
+            raise ValueError("No node with uuid '{}'".format(node))
+        # An unknown UUID may leave the list empty instead of raising.
+        if sel_list.isEmpty():
+            raise ValueError("No node with uuid '{}'".format(node))
+    else:
+        try:
+            sel_list.add(node)
+        except RuntimeError:
+            # Only a missing node, other errors are Maya's to report.
+            if cmds.objExists(node):
+                raise
+            raise ValueError("No node named '{}'".format(node))
+        if sel_list.length() > 1:
+            raise RuntimeError("More than one object matches name: {}".format(node))
     mobject = sel_list.getDependNode(0)
     return mobject
 
@@ -79,17 +120,98 @@ def get_mplug(attribute):
     return mobject
 
 
+_subclasses_cache = {}
+_subclasses_by_name_cache = {}
+
+
 def all_subclasses(cls):
     """Recursively find subclasses of a class.
 
     The subclasses should already be imported for this function to work properly.
+    Results are cached, see `clear_subclasses_cache`.
 
     Args:
         cls (type): Class to inspect.
 
     Returns:
-        set[type]: The set of subclasses.
+        frozenset[type]: The set of subclasses.
+    """
+    subclasses = _subclasses_cache.get(cls)
+    if subclasses is None:
+        subclasses = frozenset(_walk_subclasses(cls))
+        _subclasses_cache[cls] = subclasses
+    return subclasses
+
+
+def find_subclass(cls, name):
+    """Find a subclass of a class by name.
+
+    Args:
+        cls (type): Class to inspect.
+        name (str): Name of the subclass.
+
+    Returns:
+        type: The subclass, or ``None`` if no subclass has this name.
+    """
+    subclasses = _subclasses_by_name_cache.get(cls)
+    if subclasses is None or name not in subclasses:
+        # The subclass may have been defined since the cache was built.
+        if subclasses is not None:
+            clear_subclasses_cache()
+        subclasses = {subclass.__name__: subclass for subclass in all_subclasses(cls)}
+        _subclasses_by_name_cache[cls] = subclasses
+    return subclasses.get(name)
+
+
+def clear_subclasses_cache():
+    """Clear the cache of `all_subclasses` and `find_subclass`.
+
+    This is called whenever a subclass of `MetaNode` is defined.
+    """
+    _subclasses_cache.clear()
+    _subclasses_by_name_cache.clear()
+
+
+def _walk_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        for sub_subclass in _walk_subclasses(subclass):
+            yield sub_subclass
+
+
+@contextmanager
+def batch_edit():
+    """Group the Maya edits made in this context.
+
+    Viewport refreshes are suspended, and all edits are grouped in a single
+    undo chunk. Nested contexts only take effect in the outermost one.
+
+    Entering the context costs a few Maya commands, use it around batches of
+    edits, such as building or writing many MetaNodes, rather than single ones.
     """
-    return set(cls.__subclasses__()).union(
-        [s for c in cls.__subclasses__() for s in all_subclasses(c)]
-    )
+    global _batch_edit_depth
+
+    _batch_edit_depth += 1
+    outermost = _batch_edit_depth == 1
+    suspend_refresh = outermost and not _is_refresh_suspended()
+
+    if outermost:
+        cmds.undoInfo(openChunk=True)
+    if suspend_refresh:
+        cmds.refresh(suspend=True)
+    try:
+        yield
+    finally:
+        if suspend_refresh:
+            cmds.refresh(suspend=False)
+        if outermost:
+            cmds.undoInfo(closeChunk=True)
+        _batch_edit_depth -= 1
+
+
+def _is_refresh_suspended():
+    # Not every Maya version can query the suspend flag.
+    try:
+        return bool(cmds.refresh(query=True, suspend=True))
+    except (RuntimeError, TypeError):
+        return False
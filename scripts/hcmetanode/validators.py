@@ -1,14 +1,151 @@
 from __future__ import absolute_import
 
+import base64
 import json
 
 import maya.api.OpenMaya as om2
 import maya.cmds as cmds
 
+from .compat import with_metaclass
 from .metanode import MetaNode
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class FieldValidator(object):
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# `maya.cmds.addAttr` types that `FieldValidator.create_mattribute` can create.
+_NUMERIC_TYPES = {
+    "bool": om2.MFnNumericData.kBoolean,
+    "short": om2.MFnNumericData.kShort,
+    "long": om2.MFnNumericData.kLong,
+    "float": om2.MFnNumericData.kFloat,
+    "double": om2.MFnNumericData.kDouble,
+}
+_DATA_TYPES = {
+    "string": om2.MFnData.kString,
+    "matrix": om2.MFnData.kMatrix,
+}
+
+
+def _get_unit_type(plug):
+    """Return the unit type of ``plug``, if it is a unit attribute.
+
+    Unit attributes are read and written in Maya's internal units through the
+    API, but in the UI units through `maya.cmds`.
+
+    Args:
+        plug (maya.api.OpenMaya.MPlug): Plug to inspect.
+
+    Returns:
+        int: One of the ``maya.api.OpenMaya.MFnUnitAttribute`` unit types,
+            ``None`` if ``plug`` isn't a unit attribute.
+    """
+    attribute = plug.attribute()
+    if attribute.hasFn(om2.MFn.kUnitAttribute):
+        return om2.MFnUnitAttribute(attribute).unitType()
+    return None
+
+
+# Parsed `maya.cmds.addAttr` arguments of `FieldValidator.create_mattribute`.
+# Attribute MObjects can't be shared between nodes; only how to build them is.
+_attribute_recipes = {}
+
+
+def _get_attribute_recipe(kwargs):
+    """Return how to create the attribute described by ``kwargs``.
+
+    Args:
+        kwargs (dict): `maya.cmds.addAttr` keyword arguments.
+
+    Returns:
+        tuple: ``(kind, attribute_type, enum_fields)``, where ``kind`` is one of
+            ``"enum"``, ``"numeric"`` or ``"typed"``. ``None`` if ``kwargs``
+            hold flags or types not supported by the Maya API path.
+    """
+    if set(kwargs) - {"attributeType", "dataType", "enumName"}:
+        return None
+
+    attribute_type = kwargs.get("attributeType")
+    data_type = kwargs.get("dataType")
+    enum_name = kwargs.get("enumName")
+
+    key = (attribute_type, data_type, enum_name)
+    try:
+        return _attribute_recipes[key]
+    except KeyError:
+        pass
+
+    if attribute_type == "enum":
+        enum_fields = []
+        index = 0
+        for choice in (enum_name or "").split(":"):
+            if not choice:
+                continue
+            if "=" in choice:
+                choice, index = choice.split("=")
+                index = int(index)
+            enum_fields.append((choice, index))
+            index += 1
+        recipe = ("enum", None, tuple(enum_fields))
+    elif attribute_type in _NUMERIC_TYPES and data_type is None:
+        recipe = ("numeric", _NUMERIC_TYPES[attribute_type], ())
+    elif data_type in _DATA_TYPES and attribute_type is None:
+        recipe = ("typed", _DATA_TYPES[data_type], ())
+    else:
+        recipe = None
+
+    _attribute_recipes[key] = recipe
+    return recipe
+
+
+# Fastest JSON library available; they all read each other's output.
+if orjson is not None:
+
+    def _json_dumps(value):
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    _json_loads = orjson.loads
+elif ujson is not None:
+
+    def _json_dumps(value):
+        # `ujson` escapes forward slashes by default, unlike the others.
+        return ujson.dumps(value, escape_forward_slashes=False)
+
+    _json_loads = ujson.loads
+else:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+
+class ValidatorMeta(type):
+    """Metaclass of `FieldValidator`, registering all validators by name.
+
+    Attributes:
+        registry (dict[str, Type[FieldValidator]]): Validators, by class name.
+            Redefining a validator, when reloading its module for instance,
+            replaces the previous class.
+    """
+
+    registry = {}
+
+    def __init__(cls, name, bases, attrs):
+        super(ValidatorMeta, cls).__init__(name, bases, attrs)
+        ValidatorMeta.registry[name] = cls
+
+
+class FieldValidator(with_metaclass(ValidatorMeta)):
     """Base class for all field validators.
 
     A Field Validator ensures the data passed to and from the maya is of the proper type.
@@ -68,6 +205,86 @@ class FieldValidator(object):
         """
         return cls.create_attribute_kwargs
 
+    @classmethod
+    def create_mattribute(cls, name, multi=False, channel_box=False, **kwargs):
+        """Create the attribute described by ``kwargs`` with the Maya API.
+
+        Args:
+            name (str): Long and short name of the attribute.
+            multi (bool, optional): Whether to create a multi attribute.
+            channel_box (bool, optional): Whether to show the attribute in the
+                channel box.
+            **kwargs: `maya.cmds.addAttr` keyword arguments, as returned by
+                `process_kwargs`.
+
+        Returns:
+            maya.api.OpenMaya.MObject: The attribute, to add to a node.
+                ``None`` if ``kwargs`` hold flags or types not supported here,
+                in which case `maya.cmds.addAttr` should be used instead.
+        """
+        recipe = _get_attribute_recipe(kwargs)
+        if recipe is None:
+            return None
+
+        kind, attribute_type, enum_fields = recipe
+        if kind == "enum":
+            fn = om2.MFnEnumAttribute()
+            attribute = fn.create(name, name, 0)
+            for choice, index in enum_fields:
+                fn.addField(choice, index)
+        elif kind == "numeric":
+            fn = om2.MFnNumericAttribute()
+            attribute = fn.create(name, name, attribute_type)
+        else:
+            fn = om2.MFnTypedAttribute()
+            if attribute_type == om2.MFnData.kMatrix:
+                default = om2.MFnMatrixData().create(om2.MMatrix())
+            else:
+                default = om2.MObject.kNullObj
+            attribute = fn.create(name, name, attribute_type, default)
+
+        fn.keyable = False
+        fn.channelBox = channel_box
+        fn.array = multi
+        return attribute
+
+    @classmethod
+    def read_plug(cls, plug):
+        """Read the Maya attribute value of ``plug``.
+
+        Args:
+            plug (maya.api.OpenMaya.MPlug): Plug to read.
+
+        Returns:
+            Maya attribute value, as returned by `maya.cmds.getAttr`.
+
+            Default implementation calls `maya.cmds.getAttr`, validators
+            of the common attribute types query the plug directly.
+        """
+        return cmds.getAttr(plug.name())
+
+    @classmethod
+    def write_plug(cls, modifier, plug, value):
+        """Write the Maya compliant ``value`` to ``plug``.
+
+        Args:
+            modifier (maya.api.OpenMaya.MDGModifier): Modifier to queue the
+                write on. The caller is responsible for calling ``doIt``.
+            plug (maya.api.OpenMaya.MPlug): Plug to write.
+            value: Maya compliant value, as returned by `to_attribute`.
+
+        Default implementation calls `maya.cmds.setAttr` right away and
+        doesn't use ``modifier``. It unlocks the plug for the write, with
+        `maya.cmds.setAttr` too so that undoing it doesn't find a locked plug.
+        """
+        name = plug.name()
+        locked = plug.isLocked
+        if locked:
+            cmds.setAttr(name, lock=False)
+        cmds.setAttr(name, value, **cls.set_attribute_kwargs)
+        if locked:
+            cmds.setAttr(name, lock=True)
+
     @staticmethod
     def serialize(value):
         """Serialize the `FieldValidator` to a JSON serializable object.
@@ -89,6 +306,14 @@ class IntValidator(FieldValidator):
     def to_attribute(value):
         return int(value)
 
+    @staticmethod
+    def read_plug(plug):
+        return plug.asInt()
+
+    @staticmethod
+    def write_plug(modifier, plug, value):
+        modifier.newPlugValueInt(plug, value)
+
     @staticmethod
     def get_default_value():
         return 0
@@ -101,6 +326,33 @@ class FloatValidator(FieldValidator):
     def to_attribute(value):
         return float(value)
 
+    @staticmethod
+    def read_plug(plug):
+        # Values are in the UI units, as with `maya.cmds.getAttr`.
+        unit_type = _get_unit_type(plug)
+        if unit_type == om2.MFnUnitAttribute.kAngle:
+            return plug.asMAngle().asUnits(om2.MAngle.uiUnit())
+        if unit_type == om2.MFnUnitAttribute.kDistance:
+            return plug.asMDistance().asUnits(om2.MDistance.uiUnit())
+        if unit_type == om2.MFnUnitAttribute.kTime:
+            return plug.asMTime().asUnits(om2.MTime.uiUnit())
+        return plug.asDouble()
+
+    @staticmethod
+    def write_plug(modifier, plug, value):
+        unit_type = _get_unit_type(plug)
+        if unit_type == om2.MFnUnitAttribute.kAngle:
+            angle = om2.MAngle(value, om2.MAngle.uiUnit())
+            modifier.newPlugValueMAngle(plug, angle)
+        elif unit_type == om2.MFnUnitAttribute.kDistance:
+            distance = om2.MDistance(value, om2.MDistance.uiUnit())
+            modifier.newPlugValueMDistance(plug, distance)
+        elif unit_type == om2.MFnUnitAttribute.kTime:
+            time = om2.MTime(value, om2.MTime.uiUnit())
+            modifier.newPlugValueMTime(plug, time)
+        else:
+            modifier.newPlugValueDouble(plug, value)
+
     @staticmethod
     def get_default_value():
         return 0.0
@@ -113,6 +365,14 @@ class BoolValidator(FieldValidator):
     def to_attribute(value):
         return bool(value)
 
+    @staticmethod
+    def read_plug(plug):
+        return plug.asBool()
+
+    @staticmethod
+    def write_plug(modifier, plug, value):
+        modifier.newPlugValueBool(plug, value)
+
     @staticmethod
     def get_default_value():
         return False
@@ -126,6 +386,23 @@ class StringValidator(FieldValidator):
     def to_attribute(value):
         return str(value)
 
+    @staticmethod
+    def read_plug(plug):
+        # A string attribute never set reads as None, like it does through
+        # `maya.cmds.getAttr`, so default values are kept. An empty string
+        # that was set is read as is.
+        try:
+            data = plug.asMObject()
+        except RuntimeError:
+            return None
+        if data.isNull():
+            return None
+        return plug.asString()
+
+    @staticmethod
+    def write_plug(modifier, plug, value):
+        modifier.newPlugValueString(plug, value)
+
     @staticmethod
     def get_default_value():
         return ""
@@ -141,16 +418,29 @@ class MatrixValidator(FieldValidator):
     def from_attribute(value):
         return om2.MMatrix(value)
 
+    @staticmethod
+    def to_attribute(value):
+        return om2.MMatrix(value)
+
+    @staticmethod
+    def read_plug(plug):
+        try:
+            data = plug.asMObject()
+        except RuntimeError:
+            data = om2.MObject.kNullObj
+        # A matrix attribute created without a default has no data yet.
+        if data.isNull():
+            return None
+        return om2.MFnMatrixData(data).matrix()
+
+    @staticmethod
+    def write_plug(modifier, plug, value):
+        modifier.newPlugValue(plug, om2.MFnMatrixData().create(value))
+
     @staticmethod
     def serialize(value):
-        # fmt: off
-        return [
-            value[0],  value[1],  value[2],  value[3],
-            value[4],  value[5],  value[6],  value[7],
-            value[8],  value[9],  value[10], value[11],
-            value[12], value[13], value[14], value[15],
-        ]
-        # fmt: on
+        # MMatrix is a flat sequence of its 16 values, in row order.
+        return list(value)
 
     @staticmethod
     def get_default_value():
@@ -178,6 +468,14 @@ class EnumValidator(FieldValidator):
 
         return create_attribute_kwargs
 
+    @staticmethod
+    def read_plug(plug):
+        return plug.asShort()
+
+    @staticmethod
+    def write_plug(modifier, plug, value):
+        modifier.newPlugValueShort(plug, value)
+
 
 class MetaNodeValidator(StringValidator):
     """Stores and serializes the MetaNode as a uuid, returns a MetaNode."""
@@ -191,13 +489,11 @@ class MetaNodeValidator(StringValidator):
         if not value:
             return None
 
-        res = cmds.ls(value)
-
-        if res:
-            node = MetaNode(res[0])
-            return node
-
-        return None
+        try:
+            return MetaNode(value)
+        except ValueError:
+            # The node was deleted.
+            return None
 
     @staticmethod
     def serialize(value):
@@ -211,18 +507,135 @@ class MetaNodeValidator(StringValidator):
 
 
 class JsonValidator(StringValidator):
+    """Stores and serializes a JSON compatible value, as a string.
+
+    The value is encoded with `orjson` when it is available, else `ujson`, else
+    the standard `json`. Each reads the others' output, and they agree on:
+
+    - Non-string keys are written as strings, with ``OPT_NON_STR_KEYS`` for
+      `orjson`, and by default for `ujson` and `json`.
+    - Forward slashes are not escaped, with ``escape_forward_slashes=False``
+      for `ujson`.
+
+    Whitespace, and whether non-ASCII characters are escaped, depend on the
+    library, which doesn't change the value read back.
+    """
+
     @staticmethod
     def to_attribute(value):
         if value is None:
             value = {}
-        return json.dumps(value)
+        return _json_dumps(value)
 
     @staticmethod
     def from_attribute(value):
         if value is None:
             value = "{}"
-        return json.loads(value)
+        return _json_loads(value)
 
     @staticmethod
     def get_default_value():
         return {}
+
+
+class SchemaValidator(JsonValidator):
+    """Validator of the ``metanode_fields`` schema of a `MetaNode`.
+
+    The schema maps each field name to the arguments it was added with.
+
+    It is stored in a compact form, the argument names shared by all fields
+    are written once in a ``_keys`` header and each field only stores their
+    values, followed by a dict of its additional arguments if it has any::
+
+        {
+            "_keys": ["accessibility", "multi", "validator"],
+            "fields": {"my_count": [1, false, "IntValidator"]}
+        }
+
+    Schemas without a ``_keys`` header are read as plain dicts, as written
+    by older versions.
+
+    Setting `format` to ``"msgpack"`` stores the schema as base64 encoded
+    `msgpack` instead of JSON, when `msgpack` is available. JSON is the
+    default, as scenes using msgpack can't be opened where it isn't installed.
+    Both formats are read whatever `format` is.
+
+    Parsed schemas are cached by their raw string, so nodes sharing the same
+    schema (usually all nodes of a `MetaNode` subclass) only parse it once.
+    Each call returns a copy, which its `MetaNode` is free to edit.
+    """
+
+    keys = ("accessibility", "multi", "validator")
+    format = "json"
+
+    _cache = {}
+    _cache_size = 256
+
+    @classmethod
+    def to_attribute(cls, value):
+        data = cls._pack(value or {})
+        if cls.format == "msgpack" and msgpack is not None:
+            raw = base64.b64encode(msgpack.packb(data, use_bin_type=True))
+            raw = raw.decode("ascii")
+        else:
+            raw = _json_dumps(data)
+        if raw not in cls._cache:
+            cls._remember(raw, _copy_schema(value or {}))
+        return raw
+
+    @classmethod
+    def from_attribute(cls, value):
+        if not value:
+            return {}
+        schema = cls._cache.get(value)
+        if schema is None:
+            if value.startswith("{"):
+                data = _json_loads(value)
+            elif msgpack is not None:
+                data = msgpack.unpackb(base64.b64decode(value), raw=False)
+            else:
+                raise RuntimeError(
+                    "The schema is stored as msgpack, which is not installed."
+                )
+            schema = cls._unpack(data)
+            cls._remember(value, schema)
+        return _copy_schema(schema)
+
+    @classmethod
+    def _pack(cls, schema):
+        keys = cls.keys
+        fields = {}
+        for name, field_data in schema.items():
+            values = [field_data.get(key) for key in keys]
+            extra_data = {
+                key: value for key, value in field_data.items() if key not in keys
+            }
+            if extra_data:
+                values.append(extra_data)
+            fields[name] = values
+        return {"_keys": list(keys), "fields": fields}
+
+    @staticmethod
+    def _unpack(data):
+        keys = data.get("_keys")
+        if keys is None:
+            return data
+        schema = {}
+        for name, values in data["fields"].items():
+            field_data = dict(zip(keys, values))
+            if len(values) > len(keys):
+                field_data.update(values[len(keys)])
+            schema[name] = field_data
+        return schema
+
+    @classmethod
+    def _remember(cls, raw, schema):
+        if len(cls._cache) >= cls._cache_size:
+            cls._cache.clear()
+        cls._cache[raw] = schema
+
+
+def _copy_schema(schema):
+    # Field data only holds JSON values which are never edited in place,
+    # copying both dict levels is enough and much cheaper than a deep copy.
+    return {name: dict(field_data) for name, field_data in schema.items()}
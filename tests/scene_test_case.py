@@ -0,0 +1,27 @@
+import unittest
+
+import maya.cmds as cmds
+
+
+class SceneTestCase(unittest.TestCase):
+    """Start every test from the same scene.
+
+    The scene is created once per class, with the nodes from `setUpScene`.
+    Nodes created by a test are deleted before the next one.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cmds.file(new=True, force=True)
+        cls.setUpScene()
+        cls.scene_nodes = set(cmds.ls(long=True))
+
+    @classmethod
+    def setUpScene(cls):
+        """Create the nodes shared by all the tests of the class."""
+
+    def setUp(self):
+        # Cheaper than a new scene for every test.
+        new_nodes = set(cmds.ls(long=True)) - self.scene_nodes
+        if new_nodes:
+            cmds.delete(list(new_nodes))
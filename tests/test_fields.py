@@ -1,17 +1,17 @@
 from __future__ import absolute_import, with_statement
 
-import unittest
-
 import maya.cmds as cmds
 
 from hcmetanode.fields import Accessibility
 from hcmetanode.metanode import MetaNode
 from hcmetanode.validators import IntValidator
 
+from scene_test_case import SceneTestCase
+
 
-class TestMetaNode(unittest.TestCase):
+class TestMetaNode(SceneTestCase):
     def setUp(self):
-        cmds.file(new=True, force=True)
+        super(TestMetaNode, self).setUp()
 
         node_name = cmds.createNode("transform")
         self.meta_node = MetaNode(node_name)
@@ -26,3 +26,49 @@ class TestMetaNode(unittest.TestCase):
         self.meta_node.my_field.set(10)
 
         self.assertFalse(cmds.getAttr(self.meta_node.my_field.path(), lock=True))
+
+    def test_public_get_reads_maya(self):
+        self.meta_node.add_field(IntValidator, "my_field", Accessibility.public)
+
+        cmds.setAttr(self.meta_node.my_field.path(), 5)
+
+        self.assertEqual(self.meta_node.my_field.get(), 5)
+
+    def test_get_at(self):
+        self.meta_node.add_field(IntValidator, "my_field", Accessibility.public)
+        path = self.meta_node.my_field.path()
+        cmds.setAttr(path, keyable=True)
+        cmds.setKeyframe(path, time=1, value=0)
+        cmds.setKeyframe(path, time=10, value=10)
+        cmds.currentTime(1)
+
+        self.assertEqual(self.meta_node.my_field.get_at(10), 10)
+        self.assertEqual(self.meta_node.my_field.get(), 0)
+
+    def test_public_set_undo(self):
+        cmds.undoInfo(state=True)
+        self.meta_node.add_field(IntValidator, "my_field", Accessibility.public)
+        self.meta_node.my_field.set(5)
+        self.meta_node.my_field.set(10)
+
+        cmds.undo()
+
+        self.assertEqual(cmds.getAttr(self.meta_node.my_field.path()), 5)
+
+    def test_add_public_field_undo_redo(self):
+        cmds.undoInfo(state=True)
+        self.meta_node.add_field(IntValidator, "my_field", Accessibility.public)
+        path = self.meta_node.my_field.path()
+
+        cmds.undo()
+        self.assertFalse(cmds.objExists(path))
+
+        cmds.redo()
+        self.assertTrue(cmds.getAttr(path, channelBox=True))
+
+    def test_specialized_field_class_module(self):
+        self.meta_node.add_field(IntValidator, "my_field", Accessibility.public)
+        field_cls = type(self.meta_node.my_field)
+
+        self.assertEqual(field_cls.__module__, "hcmetanode.fields")
+        self.assertEqual(field_cls.__name__, "IntValidatorPublicField")
@@ -1,15 +1,16 @@
-import json
-import unittest
-
+import maya.api.OpenMaya as om2
 import maya.cmds as cmds
 from hcmetanode.fields import Accessibility
 from hcmetanode.metanode import MetaNode
-from hcmetanode.validators import IntValidator
+from hcmetanode.utils import get_mobject
+from hcmetanode.validators import IntValidator, SchemaValidator
+
+from scene_test_case import SceneTestCase
 
 
-class TestMetaNode(unittest.TestCase):
+class TestMetaNode(SceneTestCase):
     def setUp(self):
-        cmds.file(new=True, force=True)
+        super(TestMetaNode, self).setUp()
 
         node_name = cmds.createNode("transform")
         self.meta_node = MetaNode(node_name)
@@ -21,6 +22,15 @@ class TestMetaNode(unittest.TestCase):
         cmds.delete("transform2")
         self.assertFalse(cmds.objExists("transform2"))
 
+    def test_new_undo(self):
+        cmds.undoInfo(state=True)
+        path = MetaNode.new("transform").path()
+
+        # The node and its default fields are undone at once.
+        cmds.undo()
+
+        self.assertFalse(cmds.objExists(path))
+
     def test_special_new_type(self):
         class NewMetaNode(MetaNode):
             pass
@@ -43,6 +53,15 @@ class TestMetaNode(unittest.TestCase):
             MetaNode("transform2")
         self.assertTrue("does not exist" in str(context.exception))
 
+    def test_fails_on_ambiguous_name(self):
+        for parent in ("group1", "group2"):
+            cmds.createNode("transform", name=parent)
+            cmds.createNode("transform", name="child", parent=parent)
+
+        with self.assertRaises(RuntimeError) as context:
+            MetaNode("child")
+        self.assertTrue("More than one" in str(context.exception))
+
     def test_add_default_fields(self):
         node = cmds.createNode("transform")
 
@@ -63,7 +82,7 @@ class TestMetaNode(unittest.TestCase):
 
         self.meta_node.write_fields()
         metanode_fields_raw = cmds.getAttr("transform1.metanode_fields")
-        fields_data = json.loads(metanode_fields_raw)
+        fields_data = SchemaValidator.from_attribute(metanode_fields_raw)
 
         self.assertTrue("my_count" in fields_data)
         self.assertEqual(
@@ -81,7 +100,7 @@ class TestMetaNode(unittest.TestCase):
                 "metanode_fields": {
                     "accessibility": 1,
                     "multi": False,
-                    "validator": "JsonValidator",
+                    "validator": "SchemaValidator",
                 },
                 "metanode_type": {
                     "accessibility": 1,
@@ -104,6 +123,22 @@ class TestMetaNode(unittest.TestCase):
 
         self.assertDictEqual(data, expected_data)
 
+    def test_serialize_after_set(self):
+        self.meta_node.add_field(IntValidator, "my_count", Accessibility.private)
+        self.assertEqual(self.meta_node.serialize()["my_count"], 0)
+
+        self.meta_node.my_count.set(10)
+
+        self.assertEqual(self.meta_node.serialize()["my_count"], 10)
+
+    def test_serialize_reads_public_fields(self):
+        self.meta_node.add_field(IntValidator, "my_count", Accessibility.public)
+        self.assertEqual(self.meta_node.serialize()["my_count"], 0)
+
+        cmds.setAttr("transform1.my_count", 10)
+
+        self.assertEqual(self.meta_node.serialize()["my_count"], 10)
+
     def test_name(self):
         self.assertEqual(self.meta_node.name(), "transform1")
 
@@ -118,6 +153,14 @@ class TestMetaNode(unittest.TestCase):
 
         self.assertEqual(self.meta_node.path(), "|group1|transform1")
 
+    def test_path_after_parent_rename(self):
+        cmds.group("transform1")
+        self.assertEqual(self.meta_node.path(), "|group1|transform1")
+
+        cmds.rename("group1", "group2")
+
+        self.assertEqual(self.meta_node.path(), "|group2|transform1")
+
     def test_uuid(self):
         self.assertEqual(self.meta_node.uuid(), cmds.ls("transform1", uuid=True)[0])
 
@@ -125,9 +168,95 @@ class TestMetaNode(unittest.TestCase):
         other_metanode = MetaNode(self.meta_node.path())
         self.assertTrue(self.meta_node is other_metanode)
 
+    def test_from_uuid(self):
+        other_metanode = MetaNode.from_uuid(self.meta_node.uuid())
+        self.assertTrue(self.meta_node is other_metanode)
+
+    def test_from_uuid_rejects_trailing_newline(self):
+        with self.assertRaises(ValueError):
+            MetaNode.from_uuid(self.meta_node.uuid() + "\n")
+
+    def test_from_missing_uuid(self):
+        uuid = self.meta_node.uuid()
+        cmds.delete("transform1")
+
+        with self.assertRaises(ValueError):
+            MetaNode.from_uuid(uuid)
+
+    def test_same_instance_after_rename(self):
+        cmds.rename("transform1", "renamed")
+        self.assertTrue(MetaNode("renamed") is self.meta_node)
+
+    def test_same_instance_keeps_values(self):
+        self.meta_node.add_field(IntValidator, "my_count", Accessibility.private)
+        self.meta_node.my_count.set(10)
+
+        other_metanode = MetaNode(self.meta_node.path())
+
+        self.assertEqual(other_metanode.my_count.get(), 10)
+
+    def test_stored_fields_load_on_access(self):
+        self.meta_node.add_field(IntValidator, "my_count", Accessibility.private)
+        self.meta_node.my_count.set(10)
+        self.meta_node.write_fields()
+        MetaNode._instances.clear()
+
+        other_metanode = MetaNode(self.meta_node.path())
+
+        self.assertIsNot(other_metanode, self.meta_node)
+        self.assertEqual(other_metanode.my_count.get(), 10)
+        self.assertIn("my_count", other_metanode.serialize())
+
+    def test_delete_node_with_same_uuid(self):
+        uuid = self.meta_node.uuid()
+        other_node = cmds.createNode("transform")
+        om2.MFnDependencyNode(get_mobject(other_node)).setUuid(om2.MUuid(uuid))
+
+        cmds.delete(other_node)
+
+        self.assertTrue(MetaNode._instances.get(uuid) is self.meta_node)
+
+    def test_missing_field_raises(self):
+        with self.assertRaises(AttributeError):
+            self.meta_node.missing_field
+
+    def test_equality(self):
+        other_metanode = MetaNode(cmds.createNode("transform"))
+
+        self.assertEqual(self.meta_node, MetaNode("transform1"))
+        self.assertNotEqual(self.meta_node, other_metanode)
+        self.assertNotEqual(self.meta_node, None)
+        self.assertEqual(len({self.meta_node, other_metanode, self.meta_node}), 2)
+
     def test_write_field(self):
         self.meta_node.add_field(IntValidator, "my_count", Accessibility.private)
         self.meta_node.my_count.set(10)
         self.assertTrue(cmds.getAttr("{}.my_count".format(self.meta_node)) == 0)
         self.meta_node.write_fields()
         self.assertTrue(cmds.getAttr("{}.my_count".format(self.meta_node)) == 10)
+
+    def test_write_fields_locks_unchanged_fields(self):
+        self.meta_node.add_field(IntValidator, "my_count", Accessibility.private)
+
+        self.meta_node.write_fields()
+
+        self.assertTrue(cmds.getAttr("{}.my_count".format(self.meta_node), lock=True))
+
+    def test_write_fields_undo(self):
+        cmds.undoInfo(state=True)
+        self.meta_node.add_field(IntValidator, "my_count", Accessibility.private)
+        self.meta_node.my_count.set(10)
+        self.meta_node.write_fields()
+
+        cmds.undo()
+
+        # The field was never written, nor locked, before.
+        self.assertEqual(cmds.getAttr("{}.my_count".format(self.meta_node)), 0)
+        self.assertFalse(cmds.getAttr("{}.my_count".format(self.meta_node), lock=True))
+
+    def test_write_fields_locks_fields(self):
+        self.meta_node.add_field(IntValidator, "my_count", Accessibility.private)
+        self.meta_node.my_count.set(10)
+        self.meta_node.write_fields()
+        self.assertEqual(cmds.getAttr("{}.my_count".format(self.meta_node)), 10)
+        self.assertTrue(cmds.getAttr("{}.my_count".format(self.meta_node), lock=True))
@@ -0,0 +1,40 @@
+import unittest
+
+import maya.cmds as cmds
+from hcmetanode.utils import batch_edit
+
+
+class TestBatchEdit(unittest.TestCase):
+    def setUp(self):
+        cmds.file(new=True, force=True)
+        cmds.undoInfo(state=True)
+
+    def test_groups_undo(self):
+        with batch_edit():
+            cmds.createNode("transform", name="first")
+            cmds.createNode("transform", name="second")
+
+        cmds.undo()
+
+        self.assertFalse(cmds.objExists("first"))
+        self.assertFalse(cmds.objExists("second"))
+
+    def test_nested_error_restores_state(self):
+        with self.assertRaises(ValueError):
+            with batch_edit():
+                cmds.createNode("transform", name="outer")
+                with batch_edit():
+                    cmds.createNode("transform", name="inner")
+                    raise ValueError("Nested error")
+
+        self.assertFalse(cmds.refresh(query=True, suspend=True))
+
+        # The chunk was closed: later edits are undone on their own.
+        cmds.createNode("transform", name="after")
+        cmds.undo()
+        self.assertFalse(cmds.objExists("after"))
+        self.assertTrue(cmds.objExists("outer"))
+
+        cmds.undo()
+        self.assertFalse(cmds.objExists("outer"))
+        self.assertFalse(cmds.objExists("inner"))
@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 
+import json
 import unittest
 
 import maya.api.OpenMaya as om2
@@ -14,18 +15,29 @@ from hcmetanode.validators import (
     IntValidator,
     MatrixValidator,
     MetaNodeValidator,
+    SchemaValidator,
     StringValidator,
 )
 
+from scene_test_case import SceneTestCase
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # TODO: Test JsonValidator
 
 
-class TestValidators(unittest.TestCase):
-    def setUp(self):
-        cmds.file(new=True, force=True)
+class TestValidators(SceneTestCase):
+    # All the tests add their fields to the same MetaNode, each field name
+    # must only be used by one test. Tests leaving the node in a state other
+    # tests could see, such as a locked attribute, use their own node.
 
+    @classmethod
+    def setUpScene(cls):
         node_name = cmds.createNode("transform")
-        self.meta_node = MetaNode(node_name)
+        cls.meta_node = MetaNode(node_name)
 
     def test_int_validator(self):
         self.meta_node.add_field(IntValidator, "jointCount", Accessibility.private)
@@ -48,14 +60,41 @@ class TestValidators(unittest.TestCase):
         self.assertEqual(self.meta_node.armLength.get(), 10)
 
     def test_float_validator_translate_x(self):
-        self.meta_node.add_field(FloatValidator, "translateX", Accessibility.private)
-        self.meta_node.translateX.set(10)
+        # Not the shared MetaNode, writing the field locks translateX.
+        meta_node = MetaNode(cmds.createNode("transform"))
+        meta_node.add_field(FloatValidator, "translateX", Accessibility.private)
+        meta_node.translateX.set(10)
+
+        meta_node.translateX.write()
+        self.assertEqual(cmds.getAttr("{}.translateX".format(meta_node)), 10)
+
+        meta_node.translateX.read()
+        self.assertEqual(meta_node.translateX.get(), 10)
+
+    def test_float_validator_rotate_x(self):
+        # Not the shared MetaNode, writing the field locks rotateX.
+        meta_node = MetaNode(cmds.createNode("transform"))
+        meta_node.add_field(FloatValidator, "rotateX", Accessibility.private)
+        meta_node.rotateX.set(90)
+
+        meta_node.rotateX.write()
+        self.assertAlmostEqual(cmds.getAttr("{}.rotateX".format(meta_node)), 90)
 
-        self.meta_node.translateX.write()
-        self.assertEqual(cmds.getAttr("transform1.translateX"), 10)
+        meta_node.rotateX.read()
+        self.assertAlmostEqual(meta_node.rotateX.get(), 90)
 
-        self.meta_node.translateX.read()
-        self.assertEqual(self.meta_node.translateX.get(), 10)
+    def test_float_validator_translate_x_meters(self):
+        self.addCleanup(cmds.currentUnit, linear=cmds.currentUnit(query=True))
+        cmds.currentUnit(linear="m")
+        meta_node = MetaNode(cmds.createNode("transform"))
+        meta_node.add_field(FloatValidator, "translateX", Accessibility.private)
+        meta_node.translateX.set(2)
+
+        meta_node.translateX.write()
+        self.assertAlmostEqual(cmds.getAttr("{}.translateX".format(meta_node)), 2)
+
+        meta_node.translateX.read()
+        self.assertAlmostEqual(meta_node.translateX.get(), 2)
 
     def test_bool_validator(self):
         self.meta_node.add_field(BoolValidator, "isItTrue", Accessibility.private)
@@ -72,6 +111,26 @@ class TestValidators(unittest.TestCase):
         self.meta_node.my_name_is.read()
         self.assertEqual(self.meta_node.my_name_is.get(), "Jeff")
 
+    def test_string_validator_reads_cleared_string(self):
+        # Not the shared MetaNode, the attribute is left unlocked.
+        meta_node = MetaNode(cmds.createNode("transform"))
+        meta_node.add_field(StringValidator, "my_name_is", Accessibility.private)
+        meta_node.my_name_is.set("Jeff")
+        meta_node.my_name_is.write()
+
+        path = meta_node.my_name_is.path()
+        cmds.setAttr(path, lock=False)
+        cmds.setAttr(path, "", type="string")
+
+        meta_node.my_name_is.read()
+        self.assertEqual(meta_node.my_name_is.get(), "")
+
+    def test_string_validator_empty_string_unchanged(self):
+        self.meta_node.add_field(StringValidator, "empty_name", Accessibility.private)
+        self.meta_node.empty_name.write()
+
+        self.assertFalse(self.meta_node.empty_name.queue_write(om2.MDGModifier()))
+
     def test_matrix_validator(self):
         self.meta_node.add_field(MatrixValidator, "rest_matrix", Accessibility.private)
         self.meta_node.rest_matrix.set(
@@ -110,6 +169,15 @@ class TestValidators(unittest.TestCase):
             # fmt: on
         )
 
+    def test_matrix_validator_from_list(self):
+        self.meta_node.add_field(MatrixValidator, "bind_matrix", Accessibility.private)
+        values = [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 1, 2, 3, 1]
+        self.meta_node.bind_matrix.set(values)
+        self.meta_node.bind_matrix.write()
+
+        self.meta_node.bind_matrix.read()
+        self.assertEqual(self.meta_node.bind_matrix.get(), om2.MMatrix(values))
+
     def test_enum_validator(self):
         class Axes(object):
             X = 0
@@ -127,16 +195,19 @@ class TestValidators(unittest.TestCase):
         self.assertEqual(self.meta_node.upAxis.get(), Axes.X)
 
     def test_meta_node_validator(self):
-        node_name2 = cmds.createNode("transform")
-        meta_node2 = MetaNode(node_name2)
-        self.meta_node.add_field(MetaNodeValidator, "other_node", Accessibility.private)
-        self.meta_node.other_node.set(meta_node2)
+        # Not the shared MetaNode, both nodes are deleted after the test.
+        meta_node = MetaNode(cmds.createNode("transform"))
+        meta_node2 = MetaNode(cmds.createNode("transform"))
+        meta_node.add_field(MetaNodeValidator, "other_node", Accessibility.private)
+        meta_node.other_node.set(meta_node2)
 
-        self.meta_node.other_node.write()
-        self.assertEqual(cmds.getAttr("transform1.other_node"), meta_node2.uuid())
+        meta_node.other_node.write()
+        self.assertEqual(
+            cmds.getAttr("{}.other_node".format(meta_node)), meta_node2.uuid()
+        )
 
-        self.meta_node.other_node.read()
-        self.assertEqual(self.meta_node.other_node.get().uuid(), meta_node2.uuid())
+        meta_node.other_node.read()
+        self.assertEqual(meta_node.other_node.get().uuid(), meta_node2.uuid())
 
     def test_add_multi_field(self):
         self.meta_node.add_field(
@@ -158,14 +229,89 @@ class TestValidators(unittest.TestCase):
         self.meta_node.indices.read()
         self.assertEqual(self.meta_node.indices.get(), [0, 1, 2, 3])
 
+    def test_multi_field_shrink(self):
+        self.meta_node.add_field(
+            IntValidator,
+            "joint_indices",
+            Accessibility.private,
+            multi=True,
+        )
+        self.meta_node.joint_indices.set([0, 1, 2, 3])
+        self.meta_node.joint_indices.write()
+
+        self.meta_node.joint_indices.set([5, 1])
+        self.meta_node.joint_indices.write()
+
+        self.meta_node.joint_indices.read()
+        self.assertEqual(self.meta_node.joint_indices.get(), [5, 1])
+
     def test_multi_field_clear(self):
         self.meta_node.add_field(
             IntValidator,
-            "indices",
+            "clear_indices",
             Accessibility.private,
             multi=True,
         )
-        self.meta_node.indices.set([0, 1, 2, 3])
-        self.assertEqual(self.meta_node.indices.get(), [0, 1, 2, 3])
-        self.meta_node.indices.clear()
-        self.assertEqual(self.meta_node.indices.get(), [])
+        self.meta_node.clear_indices.set([0, 1, 2, 3])
+        self.assertEqual(self.meta_node.clear_indices.get(), [0, 1, 2, 3])
+        self.meta_node.clear_indices.clear()
+        self.assertEqual(self.meta_node.clear_indices.get(), [])
+
+    def test_schema_validator_returns_copies(self):
+        raw = SchemaValidator.to_attribute({"my_count": {"multi": False}})
+
+        schema = SchemaValidator.from_attribute(raw)
+        schema["my_count"]["multi"] = True
+        schema["other"] = {}
+
+        self.assertEqual(
+            SchemaValidator.from_attribute(raw), {"my_count": {"multi": False}}
+        )
+
+    def test_schema_validator_round_trip(self):
+        schema = {
+            "my_count": {
+                "accessibility": 1,
+                "multi": False,
+                "validator": "IntValidator",
+            },
+            "upAxis": {
+                "accessibility": 2,
+                "multi": False,
+                "validator": "EnumValidator",
+                "choices": ["X", "Y", "Z"],
+            },
+        }
+
+        raw = SchemaValidator.to_attribute(schema)
+
+        self.assertTrue("_keys" in json.loads(raw))
+        self.assertEqual(SchemaValidator.from_attribute(raw), schema)
+
+    def test_schema_validator_reads_legacy_format(self):
+        schema = {
+            "my_count": {
+                "accessibility": 1,
+                "multi": False,
+                "validator": "IntValidator",
+            },
+        }
+
+        self.assertEqual(SchemaValidator.from_attribute(json.dumps(schema)), schema)
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_schema_validator_msgpack(self):
+        schema = {
+            "my_count": {
+                "accessibility": 1,
+                "multi": False,
+                "validator": "IntValidator",
+            },
+        }
+        self.addCleanup(setattr, SchemaValidator, "format", SchemaValidator.format)
+        SchemaValidator.format = "msgpack"
+
+        raw = SchemaValidator.to_attribute(schema)
+
+        self.assertFalse(raw.startswith("{"))
+        self.assertEqual(SchemaValidator.from_attribute(raw), schema)